@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 
 # =========================================================
@@ -19,7 +18,7 @@ st.set_page_config(
 # CSS personalizado para mejor diseño
 
 # =========================================================
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main {
         background: linear-gradient(135deg, #e0f2fe 0%, #e0f7fa 100%);
@@ -52,11 +51,61 @@ st.markdown("""
         margin-bottom: 30px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource(show_spinner=False)
+def inject_css():
+    """Inyecta el CSS una sola vez; Streamlit reutiliza el elemento en cada ejecución"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    return True
+
+inject_css()
+
+# =========================================================
+# Pesos basados en importancia hidrológica real
+# =========================================================
+RISK_WEIGHTS = {
+    'precipitation': 0.30,      # Factor más crítico
+    'flow_volume': 0.25,        # Volumen del caudal
+    'humidity': 0.15,           # Saturación atmosférica
+    'flow_velocity': 0.12,      # Velocidad del agua
+    'sediments': 0.08,          # Obstrucción del cauce
+    'pressure': 0.05,           # Condiciones atmosféricas
+    'wind_speed': 0.03,         # Influencia menor
+    'temperature': 0.02         # Influencia indirecta
+}
+
+# Orden único de características para el producto punto vectorizado
+RISK_FEATURES = ('precipitation', 'flow_volume', 'humidity', 'flow_velocity',
+                 'sediments', 'pressure', 'wind_speed', 'temperature')
+RISK_WEIGHT_VECTOR = np.array([RISK_WEIGHTS[k] for k in RISK_FEATURES], dtype=np.float64)
+
+# =========================================================
+# Categorías de riesgo: umbrales -> (categoría, color, emoji, alerta, mensaje)
+# =========================================================
+RISK_BINS = np.array([30, 60, 80])
+RISK_CATEGORIES = [
+    ("BAJO", "green", "✅", st.success,
+     "Las condiciones actuales no representan amenaza significativa."),
+    ("MODERADO", "orange", "⚠️", st.warning,
+     "Se recomienda monitoreo constante de las condiciones."),
+    ("ALTO", "red", "🔶", st.error,
+     "Prepare medidas preventivas y alerte a la población."),
+    ("CRÍTICO", "darkred", "🚨", st.error,
+     "Evacúe las zonas de riesgo inmediatamente. Situación crítica."),
+]
 
 # =========================================================
 # Función mejorada para calcular riesgo de inundación
 # =========================================================
+def clip1(x):
+    """Limita un escalar a un máximo de 1 sin llamadas a min"""
+    return x if x < 1 else 1.0
+
+def clip01(x):
+    """Limita un escalar al rango [0, 1] sin llamadas a min/max"""
+    return 0.0 if x < 0 else (1.0 if x > 1 else x)
+
 def calculate_flood_risk(pressure, humidity, precipitation, flow_velocity, 
                          wind_speed, temperature, sediments, flow_volume):
     """
@@ -65,15 +114,15 @@ def calculate_flood_risk(pressure, humidity, precipitation, flow_velocity,
     """
     
     # Normalizar valores a escala 0-1
-    norm_precipitation = min(precipitation / 200, 1)
+    norm_precipitation = clip1(precipitation / 200)
     norm_humidity = humidity / 100
-    norm_flow_volume = min(flow_volume / 2000, 1)
-    norm_flow_velocity = min(flow_velocity / 10, 1)
-    norm_sediments = min(sediments / 500, 1)
+    norm_flow_volume = clip1(flow_volume / 2000)
+    norm_flow_velocity = clip1(flow_velocity / 10)
+    norm_sediments = clip1(sediments / 500)
     
     # Presión baja aumenta riesgo (invertir escala)
-    norm_pressure = 1 - max(0, min((pressure - 980) / 40, 1))
-    norm_wind_speed = min(wind_speed / 80, 1)
+    norm_pressure = 1 - clip01((pressure - 980) / 40)
+    norm_wind_speed = clip1(wind_speed / 80)
     
     # Temperatura óptima para tormentas (26-30 grados tiene mayor riesgo)
     if 26 <= temperature <= 32:
@@ -81,19 +130,9 @@ def calculate_flood_risk(pressure, humidity, precipitation, flow_velocity,
     elif temperature > 32:
         temp_risk = 0.5
     else:
-        temp_risk = max(0, (temperature - 15) / 15)
+        temp_risk = clip01((temperature - 15) / 15)
     
-    # Pesos basados en importancia hidrológica real
-    weights = {
-        'precipitation': 0.30,      # Factor más crítico
-        'flow_volume': 0.25,        # Volumen del caudal
-        'humidity': 0.15,           # Saturación atmosférica
-        'flow_velocity': 0.12,      # Velocidad del agua
-        'sediments': 0.08,          # Obstrucción del cauce
-        'pressure': 0.05,           # Condiciones atmosféricas
-        'wind_speed': 0.03,         # Influencia menor
-        'temperature': 0.02         # Influencia indirecta
-    }
+    weights = RISK_WEIGHTS
     
     # Calcular riesgo base
     risk = (
@@ -121,93 +160,310 @@ def calculate_flood_risk(pressure, humidity, precipitation, flow_velocity,
         risk *= 1.2  # Baja presión con lluvia fuerte
     
     # Limitar entre 0 y 100
-    return min(max(risk * 100, 0), 100)
+    return clip01(risk) * 100
+
+# =========================================================
+# Versión vectorizada del cálculo de riesgo (arrays NumPy)
+# =========================================================
+def calculate_flood_risk_vectorized(pressure, humidity, precipitation, flow_velocity,
+                                    wind_speed, temperature, sediments, flow_volume):
+    """
+    Equivalente a calculate_flood_risk pero operando sobre arrays NumPy.
+    Retorna un array de valores entre 0 y 100.
+    """
+    pressure = np.asarray(pressure, dtype=float)
+    humidity = np.asarray(humidity, dtype=float)
+    precipitation = np.asarray(precipitation, dtype=float)
+    flow_velocity = np.asarray(flow_velocity, dtype=float)
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    temperature = np.asarray(temperature, dtype=float)
+    sediments = np.asarray(sediments, dtype=float)
+    flow_volume = np.asarray(flow_volume, dtype=float)
+    
+    # Normalizar valores a escala 0-1
+    norm_precipitation = np.minimum(precipitation / 200, 1)
+    norm_humidity = humidity / 100
+    norm_flow_volume = np.minimum(flow_volume / 2000, 1)
+    norm_flow_velocity = np.minimum(flow_velocity / 10, 1)
+    norm_sediments = np.minimum(sediments / 500, 1)
+    norm_pressure = 1 - np.clip((pressure - 980) / 40, 0, 1)
+    norm_wind_speed = np.minimum(wind_speed / 80, 1)
+    
+    # Riesgo por temperatura (sin ramas, mediante máscaras)
+    in_band = (temperature >= 26) & (temperature <= 32)
+    hot = temperature > 32
+    base = np.clip((temperature - 15) / 15, 0, None)
+    temp_risk = np.where(in_band, 0.8, np.where(hot, 0.5, base))
+    
+    # Calcular riesgo base como producto punto pesos · características,
+    # con las filas en el orden de RISK_FEATURES
+    normalized = {
+        'precipitation': norm_precipitation,
+        'flow_volume': norm_flow_volume,
+        'humidity': norm_humidity,
+        'flow_velocity': norm_flow_velocity,
+        'sediments': norm_sediments,
+        'pressure': norm_pressure,
+        'wind_speed': norm_wind_speed,
+        'temperature': temp_risk,
+    }
+    shape = np.broadcast(pressure, humidity, precipitation, flow_velocity,
+                         wind_speed, temperature, sediments, flow_volume).shape
+    features = np.empty((len(RISK_FEATURES),) + shape)
+    for i, name in enumerate(RISK_FEATURES):
+        features[i] = normalized[name]
+    risk = np.tensordot(RISK_WEIGHT_VECTOR, features, axes=1)
+    
+    # Factores de sinergia combinados en un único multiplicador
+    heavy_rain = (precipitation > 100) & (humidity > 90)
+    high_flow = (flow_volume > 1200) & (flow_velocity > 5)
+    obstruction = (sediments > 300) & (flow_volume > 800)
+    low_pressure = (pressure < 990) & (precipitation > 80)
+    risk = risk * (
+        np.where(heavy_rain, 1.25, 1.0) *
+        np.where(high_flow, 1.3, 1.0) *
+        np.where(obstruction, 1.15, 1.0) *
+        np.where(low_pressure, 1.2, 1.0)
+    )
+    
+    # Limitar entre 0 y 100
+    return np.clip(risk * 100, 0, 100)
 
 # =========================================================
 # Generar datos históricos sintéticos
 # =========================================================
+@st.cache_data(show_spinner=False, ttl=3600)
 def generate_historical_data(days=30):
     """Genera datos sintéticos para los últimos N días"""
-    np.random.seed(42)
-    dates = pd.date_range(end=datetime.now(), periods=days*24, freq='H')
+    rng = np.random.default_rng(42)
+    n = days * 24
+    dates = pd.date_range(end=datetime.now(), periods=n, freq='H')
+    
+    # Todas las muestras aleatorias en un solo bloque
+    noise = rng.standard_normal((5, n))
+    precipitacion = rng.gamma(2, 15, n)
+    
+    # Ciclos diario y semanal
+    t = np.arange(n)
+    sin_daily = np.sin(t * (2 * np.pi / 24))
+    sin_weekly = np.sin(t * (2 * np.pi / (24 * 7)))
+    
+    # Parámetros como arrays NumPy independientes
+    temperatura = 15 + 10 * sin_daily + 2 * noise[0]
+    humedad = np.clip(60 + 15 * noise[1], 30, 100)
+    presion = 1013 + 10 * noise[2]
+    viento = np.abs(15 + 10 * noise[3])
+    caudal = np.clip(300 + 200 * sin_weekly + 100 * noise[4], 50, 2000)
     
-    data = {
+    # Calcular riesgo para todos los registros sobre los arrays directamente
+    riesgo = calculate_flood_risk_vectorized(
+        presion, humedad, precipitacion, 2.0, viento, temperatura, 50, caudal
+    )
+    
+    # Construir el DataFrame de una vez; float32 es suficiente para
+    # visualización y reduce a la mitad el payload
+    df = pd.DataFrame({
         'fecha': dates,
-        'precipitacion': np.random.gamma(2, 15, days*24),
-        'temperatura': 15 + 10 * np.sin(np.arange(days*24) * 2 * np.pi / 24) + np.random.normal(0, 2, days*24),
-        'humedad': np.clip(60 + np.random.normal(0, 15, days*24), 30, 100),
-        'presion': 1013 + np.random.normal(0, 10, days*24),
-        'viento': np.abs(np.random.normal(15, 10, days*24)),
-        'caudal': 300 + 200 * np.sin(np.arange(days*24) * 2 * np.pi / (24*7)) + np.random.normal(0, 100, days*24),
+        'precipitacion': precipitacion.astype(np.float32),
+        'temperatura': temperatura.astype(np.float32),
+        'humedad': humedad.astype(np.float32),
+        'presion': presion.astype(np.float32),
+        'viento': viento.astype(np.float32),
+        'caudal': caudal.astype(np.float32),
+        'riesgo': riesgo.astype(np.float32),
+    })
+    
+    return df
+
+# =========================================================
+# Estadísticas resumidas de los datos históricos
+# =========================================================
+@st.cache_data(show_spinner=False, ttl=3600)
+def compute_historical_stats(days=30):
+    """Construye la tabla de estadísticas (mín/promedio/máx) para los últimos N días"""
+    df = generate_historical_data(days)
+    
+    # Columna -> (nombre a mostrar, unidad)
+    variables = {
+        'precipitacion': ('Precipitación', ' mm'),
+        'temperatura': ('Temperatura', '°C'),
+        'humedad': ('Humedad', '%'),
+        'presion': ('Presión', ' hPa'),
+        'caudal': ('Caudal', ' m³/s'),
+        'riesgo': ('Riesgo', '%'),
     }
+    names = pd.Series({col: name for col, (name, _) in variables.items()})
+    units = pd.Series({col: unit for col, (_, unit) in variables.items()})
     
-    df = pd.DataFrame(data)
-    df['caudal'] = df['caudal'].clip(50, 2000)
+    # Mín/promedio/máx de todas las columnas en una sola pasada
+    agg = df[list(variables)].agg(['min', 'mean', 'max']).T
+    stats = agg.map('{:.1f}'.format).apply(lambda col: col + units)
+    stats.columns = ['Mínimo', 'Promedio', 'Máximo']
+    stats.insert(0, 'Variable', names)
     
-    # Calcular riesgo para cada registro
-    df['riesgo'] = df.apply(lambda row: calculate_flood_risk(
-        row['presion'], row['humedad'], row['precipitacion'],
-        2.0, row['viento'], row['temperatura'], 50, row['caudal']
-    ), axis=1)
+    return stats.reset_index(drop=True)
+
+# =========================================================
+# Construcción de gráficos (cacheados entre ejecuciones; cache_data
+# entrega una copia por sesión y descarta entradas antiguas)
+# =========================================================
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=256)
+def build_gauge_figure(flood_risk, category, color):
+    """Construye el medidor tipo gauge para el riesgo actual"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=flood_risk,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': f"<b>Riesgo de Inundación</b><br><span style='font-size:0.8em'>Categoría: {category}</span>", 
+               'font': {'size': 24}},
+        number={'suffix': "%", 'font': {'size': 60}},
+        gauge={
+            'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': "gray"},
+            'bar': {'color': color, 'thickness': 0.75},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 30], 'color': '#d1fae5'},
+                {'range': [30, 60], 'color': '#fed7aa'},
+                {'range': [60, 80], 'color': '#fecaca'},
+                {'range': [80, 100], 'color': '#fca5a5'}
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 4},
+                'thickness': 0.75,
+                'value': flood_risk
+            }
+        }
+    ))
     
-    return df
+    fig.update_layout(
+        height=400,
+        margin=dict(l=20, r=20, t=80, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#1f2937", 'family': "Arial"}
+    )
+    
+    return fig
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=4)
+def build_risk_figure(df):
+    """Gráfico de área con la evolución del riesgo histórico"""
+    fig = go.Figure(go.Scattergl(x=df['fecha'], y=df['riesgo'], mode='lines',
+                                 fill='tozeroy', line_color='#0ea5e9',
+                                 name='Riesgo (%)'))
+    
+    fig.add_hline(y=30, line_dash="dash", line_color="orange", 
+                  annotation_text="Umbral Moderado")
+    fig.add_hline(y=60, line_dash="dash", line_color="red",
+                  annotation_text="Umbral Alto")
+    
+    fig.update_layout(title='Evolución del Riesgo de Inundación',
+                      xaxis_title='Fecha', yaxis_title='Riesgo (%)',
+                      height=400, hovermode='x unified')
+    return fig
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=8)
+def build_line_figure(df, y, title, y_label, color):
+    """Gráfico de línea para un parámetro histórico"""
+    fig = go.Figure(go.Scattergl(x=df['fecha'], y=df[y], mode='lines',
+                                 line_color=color, name=y_label))
+    fig.update_layout(title=title, xaxis_title='Fecha', yaxis_title=y_label,
+                      height=300)
+    return fig
 
 # =========================================================
 # Título y descripción
 # =========================================================
-st.title("🌊 Simulador de Predicción de Inundaciones")
-st.markdown('<p class="subtitle">Introduce valores o genera datos aleatorios para predecir el riesgo de inundación.</p>', unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def render_header():
+    """Título y subtítulo de la aplicación"""
+    st.title("🌊 Simulador de Predicción de Inundaciones")
+    st.markdown('<p class="subtitle">Introduce valores o genera datos aleatorios para predecir el riesgo de inundación.</p>', unsafe_allow_html=True)
+    return True
+
+render_header()
 
 # =========================================================
 # Sidebar con controles
 # =========================================================
+# Valores iniciales y configuraciones rápidas
+DEFAULT_PARAMETERS = {
+    'pressure': 1000,
+    'humidity': 83,
+    'precipitation': 50,
+    'wind_speed': 18,
+    'temperature': 25,
+    'flow_velocity': 2.0,
+    'flow_volume': 504,
+    'sediments': 50,
+}
+
+PRESET_LOW_RISK = {
+    'pressure': 1015,
+    'humidity': 60,
+    'precipitation': 10,
+    'flow_velocity': 1.5,
+    'wind_speed': 8,
+    'temperature': 20,
+    'sediments': 30,
+    'flow_volume': 200,
+}
+
+PRESET_CRITICAL_RISK = {
+    'pressure': 985,
+    'humidity': 95,
+    'precipitation': 180,
+    'flow_velocity': 7.5,
+    'wind_speed': 55,
+    'temperature': 29,
+    'sediments': 400,
+    'flow_volume': 1800,
+}
+
+def apply_preset(preset):
+    """Carga una configuración rápida en los sliders del formulario"""
+    st.session_state.update(preset)
+
+for key, value in DEFAULT_PARAMETERS.items():
+    st.session_state.setdefault(key, value)
+
 st.sidebar.header("⚙️ Parámetros de Simulación")
 
-# Parámetros meteorológicos
-st.sidebar.subheader("🌤️ Condiciones Meteorológicas")
-pressure = st.sidebar.slider("Presión atmosférica (hPa)", 950, 1050, 1000, 1, 
-                             help="Presión baja (<990) indica tormentas")
-humidity = st.sidebar.slider("Humedad (%)", 0, 100, 83, 1,
-                            help="Alta humedad favorece precipitación")
-precipitation = st.sidebar.slider("Precipitación (mm)", 0, 200, 50, 5,
-                                 help="Factor más crítico para inundaciones")
-wind_speed = st.sidebar.slider("Velocidad del viento (km/h)", 0, 80, 18, 1,
-                              help="Vientos fuertes intensifican tormentas")
-temperature = st.sidebar.slider("Temperatura (°C)", 5, 40, 25, 1,
-                               help="26-32°C óptimo para tormentas severas")
-
-# Parámetros hidrológicos
-st.sidebar.subheader("🌊 Condiciones Hidrológicas")
-flow_velocity = st.sidebar.slider("Velocidad del caudal (m/s)", 0.0, 10.0, 2.0, 0.1,
-                                  help="Mayor velocidad = mayor poder erosivo")
-flow_volume = st.sidebar.slider("Volumen del caudal (m³/s)", 50, 2000, 504, 10,
-                                help="Volumen de agua en el río")
-sediments = st.sidebar.slider("Sedimentos (mg/L)", 0, 500, 50, 10,
-                             help="Sedimentos pueden obstruir el cauce")
-
-# Botones de presets
+# Los sliders van dentro de un formulario: solo se recalcula al pulsar "Simular"
+with st.sidebar.form("params"):
+    # Parámetros meteorológicos
+    st.subheader("🌤️ Condiciones Meteorológicas")
+    pressure = st.slider("Presión atmosférica (hPa)", 950, 1050, step=1, key='pressure',
+                         help="Presión baja (<990) indica tormentas")
+    humidity = st.slider("Humedad (%)", 0, 100, step=1, key='humidity',
+                         help="Alta humedad favorece precipitación")
+    precipitation = st.slider("Precipitación (mm)", 0, 200, step=5, key='precipitation',
+                              help="Factor más crítico para inundaciones")
+    wind_speed = st.slider("Velocidad del viento (km/h)", 0, 80, step=1, key='wind_speed',
+                           help="Vientos fuertes intensifican tormentas")
+    temperature = st.slider("Temperatura (°C)", 5, 40, step=1, key='temperature',
+                            help="26-32°C óptimo para tormentas severas")
+    
+    # Parámetros hidrológicos
+    st.subheader("🌊 Condiciones Hidrológicas")
+    flow_velocity = st.slider("Velocidad del caudal (m/s)", 0.0, 10.0, step=0.1, key='flow_velocity',
+                              help="Mayor velocidad = mayor poder erosivo")
+    flow_volume = st.slider("Volumen del caudal (m³/s)", 50, 2000, step=10, key='flow_volume',
+                            help="Volumen de agua en el río")
+    sediments = st.slider("Sedimentos (mg/L)", 0, 500, step=10, key='sediments',
+                          help="Sedimentos pueden obstruir el cauce")
+    
+    st.form_submit_button("▶️ Simular", use_container_width=True)
+
+# Botones de presets (fuera del formulario para aplicarse de inmediato)
 st.sidebar.subheader("🎯 Configuraciones Rápidas")
 col1, col2 = st.sidebar.columns(2)
 
-if col1.button("🟢 Riesgo Bajo", use_container_width=True):
-    pressure = 1015
-    humidity = 60
-    precipitation = 10
-    flow_velocity = 1.5
-    wind_speed = 8
-    temperature = 20
-    sediments = 30
-    flow_volume = 200
-
-if col2.button("🔴 Riesgo Crítico", use_container_width=True):
-    pressure = 985
-    humidity = 95
-    precipitation = 180
-    flow_velocity = 7.5
-    wind_speed = 55
-    temperature = 29
-    sediments = 400
-    flow_volume = 1800
+col1.button("🟢 Riesgo Bajo", use_container_width=True,
+            on_click=apply_preset, args=(PRESET_LOW_RISK,))
+col2.button("🔴 Riesgo Crítico", use_container_width=True,
+            on_click=apply_preset, args=(PRESET_CRITICAL_RISK,))
 
 # =========================================================
 # Calcular riesgo actual
@@ -215,27 +471,13 @@ if col2.button("🔴 Riesgo Crítico", use_container_width=True):
 flood_risk = calculate_flood_risk(pressure, humidity, precipitation, flow_velocity,
                                   wind_speed, temperature, sediments, flow_volume)
 
+# Redondear una sola vez: categoría, gauge y alerta usan el mismo valor
+# (y el gauge cacheado obtiene aciertos para valores cercanos)
+flood_risk = round(flood_risk, 1)
+
 # Determinar categoría
-if flood_risk < 30:
-    category = "BAJO"
-    color = "green"
-    emoji = "✅"
-    message = "Las condiciones actuales no representan amenaza significativa."
-elif flood_risk < 60:
-    category = "MODERADO"
-    color = "orange"
-    emoji = "⚠️"
-    message = "Se recomienda monitoreo constante de las condiciones."
-elif flood_risk < 80:
-    category = "ALTO"
-    color = "red"
-    emoji = "🔶"
-    message = "Prepare medidas preventivas y alerte a la población."
-else:
-    category = "CRÍTICO"
-    color = "darkred"
-    emoji = "🚨"
-    message = "Evacúe las zonas de riesgo inmediatamente. Situación crítica."
+category_index = int(np.searchsorted(RISK_BINS, flood_risk, side='right'))
+category, color, emoji, alert, message = RISK_CATEGORIES[category_index]
 
 # =========================================================
 # Visualización principal del riesgo
@@ -244,51 +486,12 @@ st.markdown("---")
 st.header("📊 Resultado de la Simulación")
 
 # Medidor tipo gauge
-fig_gauge = go.Figure(go.Indicator(
-    mode="gauge+number+delta",
-    value=flood_risk,
-    domain={'x': [0, 1], 'y': [0, 1]},
-    title={'text': f"<b>Riesgo de Inundación</b><br><span style='font-size:0.8em'>Categoría: {category}</span>", 
-           'font': {'size': 24}},
-    number={'suffix': "%", 'font': {'size': 60}},
-    gauge={
-        'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': "gray"},
-        'bar': {'color': color, 'thickness': 0.75},
-        'bgcolor': "white",
-        'borderwidth': 2,
-        'bordercolor': "gray",
-        'steps': [
-            {'range': [0, 30], 'color': '#d1fae5'},
-            {'range': [30, 60], 'color': '#fed7aa'},
-            {'range': [60, 80], 'color': '#fecaca'},
-            {'range': [80, 100], 'color': '#fca5a5'}
-        ],
-        'threshold': {
-            'line': {'color': "black", 'width': 4},
-            'thickness': 0.75,
-            'value': flood_risk
-        }
-    }
-))
-
-fig_gauge.update_layout(
-    height=400,
-    margin=dict(l=20, r=20, t=80, b=20),
-    paper_bgcolor="rgba(0,0,0,0)",
-    font={'color': "#1f2937", 'family': "Arial"}
-)
+fig_gauge = build_gauge_figure(flood_risk, category, color)
 
 st.plotly_chart(fig_gauge, use_container_width=True)
 
 # Mensaje de alerta
-if flood_risk < 30:
-    st.success(f"{emoji} **{category} RIESGO DE INUNDACIÓN** — {message}")
-elif flood_risk < 60:
-    st.warning(f"{emoji} **{category} RIESGO DE INUNDACIÓN** — {message}")
-elif flood_risk < 80:
-    st.error(f"{emoji} **{category} RIESGO DE INUNDACIÓN** — {message}")
-else:
-    st.error(f"{emoji} **{category} RIESGO DE INUNDACIÓN** — {message}")
+alert(f"{emoji} **{category} RIESGO DE INUNDACIÓN** — {message}")
 
 # =========================================================
 # Métricas en columnas
@@ -328,75 +531,36 @@ with col4:
 st.markdown("---")
 st.subheader("📅 Análisis Histórico (últimos 30 días)")
 
-df_historical = generate_historical_data(30)
+# El panel histórico no depende de los sliders: se construye una vez por sesión
+if 'df_hist' not in st.session_state:
+    st.session_state.df_hist = generate_historical_data(30)
+    st.session_state.fig_risk = build_risk_figure(st.session_state.df_hist)
+    st.session_state.fig_precip = build_line_figure(st.session_state.df_hist, 'precipitacion',
+                                                    'Precipitación Histórica',
+                                                    'Precipitación (mm)', '#3b82f6')
+    st.session_state.fig_caudal = build_line_figure(st.session_state.df_hist, 'caudal',
+                                                    'Volumen del Caudal Histórico',
+                                                    'Caudal (m³/s)', '#06b6d4')
+    st.session_state.stats_hist = compute_historical_stats(30)
 
 # Gráfico de riesgo histórico
-fig_risk = px.area(df_historical, x='fecha', y='riesgo',
-                   title='Evolución del Riesgo de Inundación',
-                   labels={'fecha': 'Fecha', 'riesgo': 'Riesgo (%)'},
-                   color_discrete_sequence=['#0ea5e9'])
-
-fig_risk.add_hline(y=30, line_dash="dash", line_color="orange", 
-                   annotation_text="Umbral Moderado")
-fig_risk.add_hline(y=60, line_dash="dash", line_color="red",
-                   annotation_text="Umbral Alto")
-
-fig_risk.update_layout(height=400, hovermode='x unified')
-st.plotly_chart(fig_risk, use_container_width=True)
+st.plotly_chart(st.session_state.fig_risk, use_container_width=True)
 
 # Gráficos de parámetros
 col1, col2 = st.columns(2)
 
 with col1:
-    fig_precip = px.line(df_historical, x='fecha', y='precipitacion',
-                        title='Precipitación Histórica',
-                        labels={'fecha': 'Fecha', 'precipitacion': 'Precipitación (mm)'})
-    fig_precip.update_traces(line_color='#3b82f6')
-    fig_precip.update_layout(height=300)
-    st.plotly_chart(fig_precip, use_container_width=True)
+    st.plotly_chart(st.session_state.fig_precip, use_container_width=True)
 
 with col2:
-    fig_caudal = px.line(df_historical, x='fecha', y='caudal',
-                        title='Volumen del Caudal Histórico',
-                        labels={'fecha': 'Fecha', 'caudal': 'Caudal (m³/s)'})
-    fig_caudal.update_traces(line_color='#06b6d4')
-    fig_caudal.update_layout(height=300)
-    st.plotly_chart(fig_caudal, use_container_width=True)
+    st.plotly_chart(st.session_state.fig_caudal, use_container_width=True)
 
 # =========================================================
 # Tabla de estadísticas
 # =========================================================
 st.subheader("📊 Estadísticas Resumidas")
 
-stats_data = {
-    'Variable': ['Precipitación', 'Temperatura', 'Humedad', 'Presión', 'Caudal', 'Riesgo'],
-    'Mínimo': [
-        f"{df_historical['precipitacion'].min():.1f} mm",
-        f"{df_historical['temperatura'].min():.1f}°C",
-        f"{df_historical['humedad'].min():.1f}%",
-        f"{df_historical['presion'].min():.1f} hPa",
-        f"{df_historical['caudal'].min():.1f} m³/s",
-        f"{df_historical['riesgo'].min():.1f}%"
-    ],
-    'Promedio': [
-        f"{df_historical['precipitacion'].mean():.1f} mm",
-        f"{df_historical['temperatura'].mean():.1f}°C",
-        f"{df_historical['humedad'].mean():.1f}%",
-        f"{df_historical['presion'].mean():.1f} hPa",
-        f"{df_historical['caudal'].mean():.1f} m³/s",
-        f"{df_historical['riesgo'].mean():.1f}%"
-    ],
-    'Máximo': [
-        f"{df_historical['precipitacion'].max():.1f} mm",
-        f"{df_historical['temperatura'].max():.1f}°C",
-        f"{df_historical['humedad'].max():.1f}%",
-        f"{df_historical['presion'].max():.1f} hPa",
-        f"{df_historical['caudal'].max():.1f} m³/s",
-        f"{df_historical['riesgo'].max():.1f}%"
-    ]
-}
-
-st.dataframe(pd.DataFrame(stats_data), use_container_width=True, hide_index=True)
+st.dataframe(st.session_state.stats_hist, use_container_width=True, hide_index=True)
 
 # =========================================================
 # Footer